@@ -6,6 +6,15 @@ import numpy as np
 import re
 import time
 
+_CHANNEL_KEYS = tuple(f'0x{i:X}' for i in range(16))
+"""Front panel connection keys for the 16 outputs, in bit order."""
+
+_CHANNEL_BITS = {key: i for i, key in enumerate(_CHANNEL_KEYS)}
+"""Mapping of front panel connection key to output bit number."""
+
+_STATUS_RE = re.compile(r"run-status:(\d) clock-status:(\d)(\r\n)?")
+"""Compiled pattern for parsing 'sts' responses."""
+
 class PrawnDOInterface(object):
 
     min_version = (1, 2, 0)
@@ -16,7 +25,12 @@ class PrawnDOInterface(object):
         global struct; import struct
 
         self.timeout = 0.2
-        self.conn = serial.Serial(com_port, 10000000, timeout=self.timeout)
+        # write_timeout bounds large table uploads instead of blocking
+        # forever; inter_byte_timeout stays disabled so reads return on
+        # the line terminator alone
+        self.conn = serial.Serial(com_port, 10000000, timeout=self.timeout,
+                                  write_timeout=5, inter_byte_timeout=None)
+        self._set_low_latency()
 
         version = self.get_version()
         print(f'Connected to version: {version}')
@@ -26,6 +40,24 @@ class PrawnDOInterface(object):
         current_status = self.status()
         print(f'Current status is {current_status}')
 
+    def _set_low_latency(self):
+        '''Requests a 1 ms USB-serial latency timer for the connection.
+
+        USB-serial bridges often default to a 16 ms latency timer,
+        which adds a stall to every command/response round trip.
+        This is a best-effort optimization: failures (unsupported OS,
+        driver, or permissions) are silently ignored.
+        '''
+        try:
+            import os
+            tty = os.path.basename(self.conn.port)
+            latency_path = f'/sys/bus/usb-serial/devices/{tty}/latency_timer'
+            with open(latency_path, 'w') as f:
+                f.write('1')
+        except (OSError, TypeError):
+            # not available on this platform/driver, carry on with default
+            pass
+
     def get_version(self):
 
         self.conn.write(b'ver\r\n')
@@ -83,25 +115,59 @@ class PrawnDOInterface(object):
             resp += self._read_full_buffer()
             raise LabscriptError(f"Command '{command:s}' failed. Got response '{repr(resp)}'")
     
+    def _parse_status(self, resp):
+        '''Parses a status response line.
+
+        Args:
+            resp (str): Response line to parse.
+
+        Returns:
+            (int, int): run-status and clock-status codes.
+
+        Raises:
+            LabscriptError: If the response does not parse.
+        '''
+        match = _STATUS_RE.match(resp)
+        if match:
+            return int(match.group(1)), int(match.group(2))
+        else:
+            resp += self._read_full_buffer()
+            raise LabscriptError(f'PrawnDO invalid status, returned {repr(resp)}')
+
     def status(self):
         '''Reads the status of the PrawnDO
-        
+
         Returns:
             (int, int): tuple containing
 
                 - **run-status** (int): Run status code
                 - **clock-status** (int): Clock status code
-        
+
         Raises:
             LabscriptError: If response is not `ok\\r\\n`
         '''
         resp = self.send_command('sts')
-        match = re.match(r"run-status:(\d) clock-status:(\d)(\r\n)?", resp)
-        if match:
-            return int(match.group(1)), int(match.group(2))
-        else:
-            resp += self._read_full_buffer()
-            raise LabscriptError(f'PrawnDO invalid status, returned {repr(resp)}')
+        return self._parse_status(resp)
+
+    def status_stream(self, n):
+        '''Reads the status of the PrawnDO `n` times with pipelined queries.
+
+        All queries are issued in a single write so only one round-trip
+        latency is paid for the whole burst.
+
+        Args:
+            n (int): Number of status queries to issue.
+
+        Returns:
+            list of (int, int): run-status and clock-status codes,
+            in query order.
+
+        Raises:
+            LabscriptError: If a response does not parse.
+        '''
+        self.conn.write(b'sts\r\n' * n)
+        return [self._parse_status(self.conn.readline().decode())
+                for _ in range(n)]
         
     def output_state(self):
         '''Reads the current output state of the PrawnDO
@@ -131,16 +197,41 @@ class PrawnDOInterface(object):
                 Must have first column as bit sets (<u2) and second as reps (<u4).
         '''
         self.conn.write('adm 0 {:x}\n'.format(len(pulse_program)).encode())
-        resp = self.conn.readline().decode()
-        if resp != 'ready\r\n':
-            resp += self._read_full_buffer()
+        resp = self.conn.readline()
+        if resp != b'ready\r\n':
+            resp = resp.decode() + self._read_full_buffer()
             raise LabscriptError(f'adm command failed, got response {repr(resp)}')
         self.conn.write(pulse_program.tobytes())
-        resp = self.conn.readline().decode()
-        if resp != 'ok\r\n':
-            resp += self._read_full_buffer()
+        resp = self.conn.readline()
+        if resp != b'ok\r\n':
+            resp = resp.decode() + self._read_full_buffer()
             raise LabscriptError(f'Program not written successfully, got response {repr(resp)}')
 
+    def set_batch(self, indices, instructions):
+        '''Programs individual pulse program lines using pipelined `set` commands.
+
+        All commands are issued in a single write before the responses
+        are read back, so the whole batch pays a single round-trip
+        latency instead of one per line.
+
+        Args:
+            indices (iterable): Table indices of the lines to program.
+            instructions (numpy.ndarray): Structured array of instructions
+                to write at those indices. Must have first column as bit
+                sets (<u2) and second as reps (<u4).
+
+        Raises:
+            LabscriptError: If any command does not respond with `ok`.
+        '''
+        cmds = ''.join(f'set {i:x} {instr[0]:x} {instr[1]:x}\r\n'
+                       for i, instr in zip(indices, instructions))
+        self.conn.write(cmds.encode())
+        for i in indices:
+            resp = self.conn.readline()
+            if resp != b'ok\r\n':
+                resp = resp.decode() + self._read_full_buffer()
+                raise LabscriptError(f"Programming step {i:d} failed. Got response '{repr(resp)}'")
+
     def close(self):
         self.conn.close()
 
@@ -161,7 +252,7 @@ class PrawnDOWorker(Worker):
         """
         val = 0
         for conn, value in d.items():
-            val |= value << int(conn, 16)
+            val |= value << _CHANNEL_BITS[conn]
 
         return val
     
@@ -174,8 +265,40 @@ class PrawnDOWorker(Worker):
         Returns:
             dict: Dictonary with output channels as keys and values are boolean states
         """
-        return {f'0x{i:X}':((val >> i) & 1) for i in range(16)}
+        return {key: (val >> i) & 1 for i, key in enumerate(_CHANNEL_KEYS)}
     
+    def _compress_program(self, pulse_program):
+        """Merges adjacent pulse program rows with identical bit sets.
+
+        Consecutive rows holding the same output word are combined by
+        summing their reps, shrinking the table sent over serial without
+        changing the output timing. Rows with ``reps == 0`` (wait and
+        stop markers) are never merged into or across.
+
+        Args:
+            pulse_program (numpy.ndarray): Structured array of the program.
+
+        Returns:
+            numpy.ndarray: Compressed program, or the input unchanged if
+            nothing can be merged.
+        """
+        if len(pulse_program) < 2:
+            return pulse_program
+        bits = pulse_program['bit_sets']
+        reps = pulse_program['reps']
+        mergeable = (bits[1:] == bits[:-1]) & (reps[1:] != 0) & (reps[:-1] != 0)
+        if not mergeable.any():
+            return pulse_program
+        # first row of each run of mergeable rows
+        starts = np.flatnonzero(np.concatenate(([True], ~mergeable)))
+        summed = np.add.reduceat(reps.astype(np.uint64), starts)
+        if summed.max() > np.iinfo(np.uint32).max:
+            # merged hold would overflow the reps field, leave as-is
+            return pulse_program
+        compressed = pulse_program[starts]
+        compressed['reps'] = summed
+        return compressed
+
     def check_status(self):
         '''Checks operational status of the PrawnDO.
 
@@ -241,7 +364,15 @@ class PrawnDOWorker(Worker):
                 return
             self.device_properties = labscript_utils.properties.get(
                 hdf5_file, device_name, "device_properties")
-            pulse_program = group['pulse_program'][()]
+            # read_direct into a preallocated buffer avoids h5py's
+            # fancy-indexing path and an extra copy
+            dataset = group['pulse_program']
+            pulse_program = np.empty(dataset.shape, dtype=dataset.dtype)
+            dataset.read_direct(pulse_program)
+
+        # shrink the table before diffing/uploading; every downstream
+        # cost scales with its length
+        pulse_program = self._compress_program(pulse_program)
 
         # configure clock from device properties
         ext = self.device_properties['external_clock']
@@ -255,19 +386,22 @@ class PrawnDOWorker(Worker):
             curr_program = self.smart_cache['pulse_program']
 
             # if arrays aren't of same shape, only compare up to smaller array size
+            # technically don't need to reprogram current elements beyond end of new elements
             n_curr = len(curr_program)
             n_new = len(pulse_program)
-            if n_curr > n_new:
-                # technically don't need to reprogram current elements beyond end of new elements
-                new_inst = np.sum(curr_program[:n_new] != pulse_program)
-            elif n_curr < n_new:
-                n_diff = n_new - n_curr
-                val_diffs = np.sum(curr_program != pulse_program[:n_curr])
-                new_inst = val_diffs + n_diff
+            n_min = min(n_curr, n_new)
+            if n_curr == n_new and np.array_equal(curr_program, pulse_program):
+                # identical rerun, skip the element-wise diff entirely
+                new_inst = n_edited = 0
             else:
-                new_inst = np.sum(curr_program != pulse_program)
-
-            if new_inst / n_new > 0.1:
+                n_edited = np.count_nonzero(curr_program[:n_min] != pulse_program[:n_min])
+                new_inst = n_edited
+                if n_curr < n_new:
+                    new_inst += n_new - n_curr
+
+            # appended rows upload just as efficiently through set_batch,
+            # so only edits to existing rows argue for a full refresh
+            if n_edited / n_new > 0.1:
                 fresh = True
 
         # if fresh or not smart cache, program full table as a batch
@@ -276,22 +410,17 @@ class PrawnDOWorker(Worker):
             self.intf.send_command_ok('cls') # clear old program
             self.intf.adm_batch(pulse_program)
             self.smart_cache['pulse_program'] = pulse_program
-        else:
-            # only program table lines that have changed
-            n_cache = len(self.smart_cache['pulse_program'])
-            for i, instr in enumerate(pulse_program):
-                if i >= n_cache:
-                    print(f'programming step {i}')
-                    self.intf.send_command_ok(f'set {i:x} {instr[0]:x} {instr[1]:x}')
-                    self.smart_cache['pulse_program'][i] = instr
-
-                elif (self.smart_cache['pulse_program'][i] != instr):
-
-                    print(f'programming step {i}')
-                    self.intf.send_command_ok(f'set {i:x} {instr[0]:x} {instr[1]:x}')
-                    self.smart_cache['pulse_program'][i] = instr
+        elif new_inst:
+            # only program table lines that have changed, plus any rows
+            # appended beyond the end of the cached table
+            changed = np.flatnonzero(curr_program[:n_min] != pulse_program[:n_min])
+            changed = np.concatenate((changed, np.arange(n_curr, n_new)))
+            self.intf.set_batch(changed, pulse_program[changed])
+            self.smart_cache['pulse_program'] = pulse_program
 
-        final_values = self._int_to_dict(pulse_program[-1][0])
+        # cast to a Python int so the 16 shift/mask ops in _int_to_dict
+        # run on machine ints rather than NumPy scalars
+        final_values = self._int_to_dict(int(pulse_program['bit_sets'][-1]))
 
         # start program, waiting for beginning trigger from parent
         self.intf.send_command_ok('run')
@@ -304,19 +433,23 @@ class PrawnDOWorker(Worker):
         Returns:
             bool: `True` if transition to manual is successful.
         """
-        i = 0
+        timeout = time.monotonic() + 10
+        delay = 0.001
         while True:
-            run_status, _ = self.intf.status()
-            i += 1
-            if run_status == 0:
-                return True
-            elif i == 1000:
+            # burst of pipelined queries costs a single round trip
+            for run_status, _ in self.intf.status_stream(4):
+                if run_status == 0:
+                    return True
+                elif run_status in [3,4,5]:
+                    raise LabscriptError(f'PrawnDO returned status {run_status} in transition to manual')
+            if time.monotonic() > timeout:
                 # program hasn't ended, probably bad triggering
                 # abort and raise an error
                 self.abort_buffered()
                 raise LabscriptError(f'PrawnDO did not end with status {run_status:d}. Is triggering working?')
-            elif run_status in [3,4,5]:
-                raise LabscriptError(f'PrawnDO returned status {run_status} in transition to manual')
+            # back off exponentially so long shots don't saturate the serial link
+            time.sleep(delay)
+            delay = min(2 * delay, 0.1)
 
     def abort_buffered(self):
         """Aborts a currently running buffered execution.
@@ -326,8 +459,10 @@ class PrawnDOWorker(Worker):
         """
         self.intf.send_command_ok('abt')
         # loop until abort complete
+        delay = 0.01
         while self.intf.status()[0] != 5:
-            time.sleep(0.5)
+            time.sleep(delay)
+            delay = min(2 * delay, 0.2)
         return True
 
     def abort_transition_to_buffered(self):
@@ -5,7 +5,6 @@ from labscript import (
     ClockLine,
     DigitalOut,
     Trigger,
-    bitfield,
     set_passed_properties,
     LabscriptError
 )
@@ -46,10 +45,10 @@ class _PrawnDOClockline(ClockLine):
 class _PrawnDigitalOutputs(IntermediateDevice):
     allowed_children = [DigitalOut]
 
-    allowed_channels = ('0', '1', '2', '3',
-                        '4', '5', '6', '7',
-                        '8', '9', 'A', 'B',
-                        'C', 'D', 'E', 'F')
+    allowed_channels = frozenset(('0', '1', '2', '3',
+                                  '4', '5', '6', '7',
+                                  '8', '9', 'A', 'B',
+                                  'C', 'D', 'E', 'F'))
 
     def __init__(self, name, parent_device,
                  **kwargs):
@@ -64,7 +63,7 @@ class _PrawnDigitalOutputs(IntermediateDevice):
         """
 
         IntermediateDevice.__init__(self, name, parent_device, **kwargs)
-        self.connected_channels = []
+        self.connected_channels = set()
 
     def add_device(self, device):
         """Confirms channel specified is valid before adding
@@ -83,7 +82,10 @@ class _PrawnDigitalOutputs(IntermediateDevice):
         if chan in self.connected_channels:
             raise LabscriptError(f'Channel {conn} already connected to {self.parent_device.name}')
         
-        self.connected_channels.append(chan)
+        self.connected_channels.add(chan)
+        # cache the parsed bit number so generate_code doesn't re-parse
+        # the connection string on every compile
+        device._prawndo_bit = int(chan, 16)
         super().add_device(device)
     
 
@@ -217,52 +219,68 @@ class PrawnDO(PseudoclockDevice):
     def generate_code(self, hdf5_file):
         PseudoclockDevice.generate_code(self, hdf5_file)
 
-        bits = [0] * 16 # Start with a list of 16 zeros
-        # Isolating the Pod child device in order to access the output change 
-        # times to store in the array
-
         # Retrieving all of the outputs contained within the pods and
         # collecting/consolidating the times when they change
         outputs = self.get_all_outputs()
         times = self.__pseudoclock.times[self.__clockline]
         instructions = self.__pseudoclock.clock
-        if len(times) == 0:
+        n_times = len(times)
+        if n_times == 0:
             # no instructions, so return
             return
 
         # get where wait instructions should be added from clock instructions
         wait_idxs = [i for i,instr in enumerate(instructions) if instr=='WAIT']
 
-        # Retrieving the time series of each DigitalOut to be stored
-        # as the output word for the pins
-        for output in outputs:  
-            output.make_timeseries(times)
-            chan = output.connection.split(' ')[-1]
-            bits[int(chan, 16)] = np.asarray(output.timeseries, dtype = np.uint16)
-        # Merge list of lists into an array with a single 16 bit integer column
-        bit_sets = np.array(bitfield(bits, dtype=np.uint16))
-
-        # Now create the reps array (ie times between changes in number of clock cycles)
-        reps = np.rint(np.diff(times)/self.clock_resolution).astype(np.uint32)
-        
-        # add stop command sequence
-        # final output already in bit_sets
-        reps = np.append(reps, 0) # causes last instruction to hold
-        # next two indicate the stop
-        bit_sets = np.append(bit_sets, 0) # this value is ignored
-        reps = np.append(reps, 0)
-
-        # Add in wait instructions to reps
-        # have output maintain previous output state during wait
-        reps = np.insert(reps, wait_idxs, 0)
-        bit_sets = np.insert(bit_sets, wait_idxs, bit_sets[wait_idxs])
-
-        # Raising an error if the user adds too many commands
-        if reps.size > self.max_instructions:
+        # Raising an error if the user adds too many commands,
+        # before any time is spent building the tables
+        if n_times + 1 + len(wait_idxs) > self.max_instructions:
             raise LabscriptError (
                 "Too Many Commands"
             )
 
+        # Retrieving the time series of each DigitalOut and packing them
+        # into the output words for the pins via shift and OR, all at
+        # C level rather than labscript's per-bit bitfield loop
+        # body arrays are allocated once with the stop command sequence
+        # included: the zero rep at n_times-1 causes the last instruction
+        # to hold, and the final all-zero row marks the stop (its output
+        # value is ignored)
+        fromiter = np.fromiter # hoist lookup out of the per-channel loop
+        bit_sets = np.zeros(n_times + 1, dtype=np.uint16)
+        for output in outputs:
+            output.make_timeseries(times)
+            # timeseries is a Python list; fromiter with a known count
+            # converts it faster than asarray
+            series = fromiter(output.timeseries, dtype=np.uint16, count=n_times)
+            bit_sets[:n_times] |= series << output._prawndo_bit
+
+        # Now create the reps array (ie times between changes in number of clock cycles)
+        # quantize the times to integer clock ticks first so the
+        # durations come from an exact integer diff, with rounding
+        # done in place on the single scratch buffer
+        reps = np.zeros(n_times + 1, dtype=np.uint32)
+        scratch = np.divide(times, self.clock_resolution)
+        np.rint(scratch, out=scratch)
+        ticks = scratch.astype(np.int64)
+        np.copyto(reps[:n_times-1], np.diff(ticks), casting='unsafe')
+
+        # Add in wait instructions with a single scatter pass,
+        # with outputs maintaining their previous state during each wait
+        # skipped entirely for the common no-wait sequence
+        n_wait = len(wait_idxs)
+        if n_wait:
+            wait_pos = np.asarray(wait_idxs, dtype=np.intp) + np.arange(n_wait)
+            mask = np.ones(len(reps) + n_wait, dtype=bool)
+            mask[wait_pos] = False
+            all_reps = np.zeros(mask.size, dtype=np.uint32) # wait rows have zero reps
+            all_reps[mask] = reps
+            all_bit_sets = np.empty(mask.size, dtype=np.uint16)
+            all_bit_sets[mask] = bit_sets
+            all_bit_sets[wait_pos] = all_bit_sets[wait_pos + 1]
+            reps = all_reps
+            bit_sets = all_bit_sets
+
         group = hdf5_file['devices'].require_group(self.name)
         # combining reps and bit sets into single structured array for saving to hdf5 file
         dtype = np.dtype([('bit_sets', '<u2'),
@@ -270,7 +288,8 @@ class PrawnDO(PseudoclockDevice):
         pulse_program = np.zeros(len(reps), dtype=dtype)
         pulse_program['bit_sets'] = bit_sets
         pulse_program['reps'] = reps
-        group.create_dataset('pulse_program', data=pulse_program)
+        group.create_dataset('pulse_program', data=pulse_program,
+                             compression='gzip')
 
 
 class _PrawnDOIntermediateDevice(IntermediateDevice):
@@ -5,80 +5,108 @@ import numpy as np
 import labscript_utils.properties as properties
 
 class PrawnDOParser(object):
+    __slots__ = ('path', 'name', 'device', 'clock_resolution',
+                 'trigger_delay', 'wait_delay', '_table_cache', '_channels')
+
     def __init__(self, path, device):
         self.path = path
         self.name = device.name
         self.device = device
-
+        self._table_cache = None
+        self._channels = None
+
+
+    def _get_channels(self):
+        """Walks the device tree down to the digital output channels.
+
+        The walk is done once and cached; the connection table does not
+        change for the lifetime of the parser.
+
+        Returns:
+            list: Tuples of ``(channel name, parent port, bit number)``
+            for each connected digital output.
+        """
+        if self._channels is None:
+            channels = []
+            # work down the tree of parent devices to the digital outputs
+            for pseudoclock in self.device.child_list.values():
+                for clock_line in pseudoclock.child_list.values():
+                    for internal_device in clock_line.child_list.values():
+                        for channel_name, channel in internal_device.child_list.items():
+                            bit = int(channel.parent_port.split(' ')[-1], 16)
+                            channels.append((channel_name, channel.parent_port, bit))
+            self._channels = channels
+        return self._channels
 
     def get_traces(self, add_trace, clock = None):
 
 
         if clock is not None:
             times, clock_value = clock[0], clock[1]
-            clock_indices = np.where((clock_value[1:] - clock_value[:-1]) == 1)[0] + 1
-            # If initial clock value is 1, then this counts as a rising edge
-            # (clock should be 0 before experiment) but this is not picked up
-            # by the above code. So we insert it!
+            # only the first rising edge (the starting trigger) is used,
+            # so find just that index rather than gathering every edge
             if clock_value[0] == 1:
-                clock_indices = np.insert(clock_indices, 0, 0)
-            clock_ticks = times[clock_indices]
+                # an initial high value counts as a rising edge
+                # (clock should be 0 before experiment)
+                first_tick = times[0]
+            else:
+                # argmax returns the first True of the edge comparison
+                first_tick = times[int(np.argmax(clock_value[1:] > clock_value[:-1])) + 1]
 
         # Getting pulse_program from the shot file
-        with h5py.File(self.path, "r") as f:
-            device_props = properties.get(f, self.name, 'device_properties')
-            self.clock_resolution = device_props['clock_resolution']
-            self.trigger_delay = device_props['trigger_delay']
-            self.wait_delay = device_props['wait_delay']
-
-            group = f['devices/' + self.name]
-
-            pulse_program = group['pulse_program'][()]
+        # cached across calls since the shot file doesn't change once run
+        if self._table_cache is None:
+            with h5py.File(self.path, "r") as f:
+                device_props = properties.get(f, self.name, 'device_properties')
+
+                group = f['devices/' + self.name]
+
+                # read_direct into a preallocated buffer avoids h5py's
+                # fancy-indexing path and an extra copy
+                dataset = group['pulse_program']
+                pulse_program = np.empty(dataset.shape, dtype=dataset.dtype)
+                dataset.read_direct(pulse_program)
+            self._table_cache = (device_props, pulse_program)
+
+        device_props, pulse_program = self._table_cache
+        # plain Python floats keep later scalar arithmetic off NumPy scalars
+        self.clock_resolution = float(device_props['clock_resolution'])
+        self.trigger_delay = float(device_props['trigger_delay'])
+        self.wait_delay = float(device_props['wait_delay'])
 
         # remove final element from program (2nd part of stop instruction)
-        pulse_program = np.delete(pulse_program, -1)
+        # a slice view is enough, no need for np.delete's copy
+        pulse_program = pulse_program[:-1]
         time_deltas_table = pulse_program['reps']*self.clock_resolution
         # re-add trigger delay
-        trigger_index = 0
-        t = 0 if clock is None else clock_ticks[trigger_index] + self.trigger_delay
+        t = 0 if clock is None else first_tick + self.trigger_delay
         time_deltas_table[0] += t
         # re-add wait delays (ignoring final one, which is from the 1st part of stop command)
         wait_idxs = np.nonzero(pulse_program['reps']==0)[0][:-1]
-        for wait_idx in wait_idxs:
-            if clock is not None:
-                t = self.trigger_delay
-            else:
-                t = self.wait_delay
-            time_deltas_table[wait_idx] += t
-        # insert t=0 for cumsum, remove final value (from stop instruction)
-        times_table = np.cumsum(np.insert(time_deltas_table,0,0.0))[:-1]
+        wait_t = self.trigger_delay if clock is not None else self.wait_delay
+        time_deltas_table[wait_idxs] += wait_t
+        # cumsum into a pre-sized array: times start at 0 and the final
+        # delta (from the stop instruction) contributes no time point
+        times_table = np.empty(len(time_deltas_table), dtype=np.float64)
+        times_table[0] = 0.0
+        np.cumsum(time_deltas_table[:-1], out=times_table[1:])
 
         
-        # convert bit sets back to individual bits for each output
-        do_bitfield = np.fliplr( # reverse bit order for indexing by label
-            np.unpackbits(
-                pulse_program['bit_sets'].reshape(pulse_program.shape + (1,) # reshape so unpackbits does each number separate
-                                 ).byteswap().view(np.uint8), # switch endianness, view at uint8 for unpackbits
-                                 axis=1) # unpack along time axis
-        )
-
         digital_outs = {}
 
-        # work down the tree of parent devices to the digital outputs
-        for pseudoclock_name, pseudoclock in self.device.child_list.items():
-            for clock_line_name, clock_line in pseudoclock.child_list.items():
-                for internal_device_name, internal_device in clock_line.child_list.items():
-                    for channel_name, channel in internal_device.child_list.items():
-                        chan = channel.parent_port.split(' ')[-1]
-                        output_trace = (times_table, do_bitfield[:,int(chan,16)])
-                        digital_outs[channel_name] = output_trace
-                        add_trace(channel_name, output_trace,
-                                  self.name, channel.parent_port)
-            
+        # extract each connected channel's bit lazily with a shift/mask
+        # rather than materializing the full 16-column bit matrix
+        bit_sets = pulse_program['bit_sets']
+        for channel_name, port, bit in self._get_channels():
+            output_trace = (times_table, (bit_sets >> np.uint16(bit)) & 1)
+            digital_outs[channel_name] = output_trace
+            add_trace(channel_name, output_trace, self.name, port)
+
         return digital_outs
 
 
 class _PrawnDOIntermediateParser(object):
+    __slots__ = ('path', 'name', 'device')
 
     def __init__(self, path, device):
         self.path = path